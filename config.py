@@ -7,3 +7,5 @@ REQUIRED_KEYS = [
     "body",
     "link",
 ]
+# Same keys as a frozenset, so completeness can be checked with one issubset() call
+REQUIRED_KEYS_FS = frozenset(REQUIRED_KEYS)
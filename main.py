@@ -1,27 +1,39 @@
 import asyncio
 import argparse
-import time
+import atexit
+import logging
+import signal
 import os
 import csv
 import random
+import sys
+import threading
+from typing import Union
 
-from crawl4ai import AsyncWebCrawler
 from dotenv import load_dotenv
 
-from config import BASE_URL, REQUIRED_KEYS
-from utils.data_utils import (
-    save_posts_to_csv,
-)
-from utils.scraper_utils import (
-    extract_blog_post_links,
-    scrape_blog_post,
-    get_browser_config,
+from config import BASE_URL, REQUIRED_KEYS_FS
+from utils.concurrency_utils import AutoscaledPool, HostRateLimiter, make_session_pool
+from utils.data_utils import CsvSink
+from utils.dedup_utils import (
+    BloomSet,
+    compact_link_set,
+    index_path,
+    load_link_index,
+    save_link_index,
 )
 
-load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Built at import time so that --help works without loading crawl4ai
+parser = argparse.ArgumentParser(description='Scrape blog posts from UpGuard blog')
+parser.add_argument('--max-posts', type=int, default=10, help='Maximum number of posts to scrape (default: 10)')
+parser.add_argument('--delay', type=int, default=5, help='Delay between requests in seconds (default: 5)')
+parser.add_argument('--output', type=str, default='upguard_blog_posts.csv', help='Output CSV file (default: upguard_blog_posts.csv)')
+parser.add_argument('--random', type=float, default=0.3, help='Share of --max-posts reserved for refreshing already scraped posts, picked at random (0-1, default: 0.3). With 1, no new posts are scraped as long as enough old ones exist')
 
 
-def load_existing_posts(csv_filename: str) -> set:
+def load_existing_posts(csv_filename: str) -> Union[set, BloomSet]:
     """
     Load already scraped posts from the CSV file.
     
@@ -29,25 +41,39 @@ def load_existing_posts(csv_filename: str) -> set:
         csv_filename (str): Path to the CSV file
         
     Returns:
-        set: Set of links that have already been scraped
+        Union[set, BloomSet]: Links that have already been scraped. Large sets are
+            returned as a BloomSet to keep memory usage low.
     """
     scraped_links = set()
     
     if not os.path.exists(csv_filename):
-        print(f"No existing CSV file found at {csv_filename}")
+        logger.info("No existing CSV file found at %s", csv_filename)
         return scraped_links
+
+    # Reuse the on-disk index when it is newer than the CSV file
+    link_index = load_link_index(csv_filename)
+    if link_index is not None:
+        logger.info("Loaded %d already scraped posts from %s", len(link_index), index_path(csv_filename))
+        return link_index
         
     try:
-        with open(csv_filename, mode='r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                if 'link' in row and row['link']:
-                    scraped_links.add(row['link'])
+        with open(csv_filename, mode='r', newline='', encoding='utf-8') as file:
+            # Only the link column is needed, so skip building a dict per row
+            reader = csv.reader(file)
+            try:
+                header = next(reader)
+            except StopIteration:
+                header = []
+            if 'link' in header:
+                link_idx = header.index('link')
+                scraped_links = {row[link_idx] for row in reader if len(row) > link_idx and row[link_idx]}
                     
-        print(f"Loaded {len(scraped_links)} already scraped posts from {csv_filename}")
+        logger.info("Loaded %d already scraped posts from %s", len(scraped_links), csv_filename)
     except Exception as e:
-        print(f"Error loading existing posts: {str(e)}")
+        logger.error("Error loading existing posts: %s", e)
         
+    scraped_links = compact_link_set(scraped_links)
+    save_link_index(scraped_links, csv_filename)
     return scraped_links
 
 
@@ -57,16 +83,32 @@ async def crawl_blog_posts(max_posts: int = 10, delay_seconds: int = 5, csv_file
     
     Args:
         max_posts (int): Maximum number of blog posts to crawl
-        delay_seconds (int): Delay between API calls to avoid rate limits
+        delay_seconds (int): Average delay between two requests to the same host, used
+            until the server's rate-limit headers say otherwise
         csv_filename (str): Path to the CSV file to save posts
-        random_factor (float): Probability (0-1) of selecting an already scraped post to refresh
+        random_factor (float): Share (0-1) of max_posts reserved for refreshing already
+            scraped posts, picked at random. New posts fill the rest, and any refresh slots
+            left when there are too few old posts. With 1, no new posts are scraped as
+            long as enough old ones exist
     """
+    # crawl4ai pulls in Playwright and friends, only import it when actually crawling
+    from crawl4ai import AsyncWebCrawler
+
+    from utils.scraper_utils import (
+        extract_blog_post_links,
+        scrape_blog_post,
+        get_browser_config,
+    )
+
     # Load already scraped posts
     already_scraped_links = load_existing_posts(csv_filename)
     
     # Initialize configurations
     browser_config = get_browser_config()
     session_id = "blog_post_crawl_session"
+    max_concurrency = max(int(os.getenv("CRAWL_CONCURRENCY", "20")), 1)
+    # Number of scraped posts buffered in memory before they are written to the CSV file
+    flush_batch = max(int(os.getenv("CSV_FLUSH_BATCH", "64")), 1)
 
     # Initialize state variables
     all_posts = []
@@ -78,119 +120,197 @@ async def crawl_blog_posts(max_posts: int = 10, delay_seconds: int = 5, csv_file
     skipped_posts = 0
     refreshed_posts = 0
 
-    print(f"Starting blog crawler. Will scrape up to {max_posts} posts with {delay_seconds}s delay between requests.")
-    print(f"Random factor: {random_factor:.2f} - Approximately {int(random_factor*100)}% chance to refresh already scraped posts")
+    logger.info(
+        "Starting blog crawler. Will scrape up to %d posts with up to %d concurrent requests and ~%ss between requests.",
+        max_posts, max_concurrency, delay_seconds,
+    )
+    logger.info(
+        "Random factor: %.2f - Approximately %d%% of the posts will be refreshes of already scraped posts",
+        random_factor, int(random_factor * 100),
+    )
 
     # Start the web crawler context
-    async with AsyncWebCrawler(config=browser_config) as crawler:
+    async with AsyncWebCrawler(config=browser_config) as crawler, HostRateLimiter(delay_seconds) as limiter:
+        # Concurrency and politeness are decoupled: the pool adapts the number of
+        # in-flight pages to the site's health while the token bucket spaces out
+        # the requests.
+        pool = AutoscaledPool(desired_concurrency=min(4, max_concurrency), max_concurrency=max_concurrency)
+        sessions = make_session_pool(session_id, max_concurrency)
+
+        # A single CSV handle is kept open for the whole crawl. Saves run in a worker
+        # thread; the lock keeps them and the exit flush from writing at the same time.
+        sink = CsvSink(csv_filename, already_scraped_links)
+        save_lock = threading.Lock()
+
+        def write_posts(posts: list):
+            with save_lock:
+                # Flushes the rows, which the link index below has to be saved after
+                sink.append(posts)
+                logger.info("Saved %d buffered blog posts to '%s'.", len(posts), csv_filename)
+                # The sink added the links to already_scraped_links, keep the
+                # on-disk link index in sync with the CSV file
+                save_link_index(already_scraped_links, csv_filename)
+
+        def take_pending() -> list:
+            # Swap the buffer so workers can keep adding posts while it is written
+            nonlocal all_posts
+            posts, all_posts = all_posts, []
+            return posts
+
+        def close_sink():
+            with save_lock:
+                # Only the final flush is fsynced, batch saves rely on the OS buffers
+                sink.close(durable=True)
+
+        async def flush_pending():
+            posts = take_pending()
+            if posts:
+                # Write off the event loop so that the other scrapes keep progressing
+                await asyncio.to_thread(write_posts, posts)
+
+        def flush_on_exit():
+            posts = take_pending()
+            if posts:
+                write_posts(posts)
+            close_sink()
+
+        def on_signal(signum: int):
+            logger.warning("Interrupted, saving buffered posts before exiting...")
+            flush_on_exit()
+            if signum == signal.SIGINT:
+                raise KeyboardInterrupt
+            raise SystemExit(128 + signum)
+
+        # Make sure buffered posts are not lost on exit or Ctrl+C
+        atexit.register(flush_on_exit)
+        loop = asyncio.get_running_loop()
+        handled_signals = []
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, on_signal, signum)
+                handled_signals.append(signum)
+            except (NotImplementedError, RuntimeError):
+                # Signal handlers are not supported on this platform (e.g. Windows)
+                pass
+
+        async def worker(link_data: dict):
+            nonlocal all_posts, processed_posts, successful_posts, failed_posts, skipped_posts, refreshed_posts
+
+            title = link_data.get("title", "Unknown Title")
+            link = link_data.get("link", "")
+            
+            if not link:
+                logger.debug("Skipping post with missing link: %s", title)
+                return
+                
+            # Skip duplicates within current run
+            if link in seen_links:
+                logger.debug("Skipping duplicate link in this run: %s", title)
+                return
+            
+            seen_links.add(link)
+
+            worker_session = await sessions.get()
+            try:
+                # Scrape the individual blog post, the limiter spaces out requests per host
+                # Refreshes must hit the site, a cached copy would defeat their purpose
+                post_data = await scrape_blog_post(
+                    crawler,
+                    link,
+                    title,
+                    worker_session,
+                    on_result=pool.record,
+                    limiter=limiter,
+                    use_cache=link not in already_scraped_links,
+                )
+            finally:
+                sessions.put_nowait(worker_session)
+            
+            # Increment the processed counter regardless of success
+            processed_posts += 1
+            
+            if post_data and REQUIRED_KEYS_FS.issubset(post_data):
+                all_posts.append(post_data)
+                if link in already_scraped_links:
+                    refreshed_posts += 1
+                    logger.debug("Successfully refreshed post %d/%d: %s", processed_posts, max_posts, title)
+                else:
+                    successful_posts += 1
+                    logger.debug("Successfully scraped new post %d/%d: %s", processed_posts, max_posts, title)
+                
+                # Save in batches to preserve progress without writing on every post
+                if len(all_posts) >= flush_batch or processed_posts >= max_posts:
+                    await flush_pending()
+            else:
+                failed_posts += 1
+                logger.warning("Failed to scrape post or missing required data: %s", title)
+                
+            # Debug output to track progress
+            logger.info(
+                "Progress: %d/%d posts processed (%d new, %d refreshed, %d failed)",
+                processed_posts, max_posts, successful_posts, refreshed_posts, failed_posts,
+            )
+
+            if processed_posts >= max_posts:
+                logger.info("Reached the maximum of %d posts processed. Stopping.", max_posts)
+                pool.stop()
+
         try:
             # Step 1: Extract links to blog posts from the main page
             links = await extract_blog_post_links(crawler, BASE_URL, session_id)
             
             if not links:
-                print("No blog post links found on the main page.")
+                logger.warning("No blog post links found on the main page.")
                 return
                 
             total_new_posts = sum(1 for link_data in links if link_data.get("link") and link_data["link"] not in already_scraped_links)
-            print(f"Found {len(links)} blog post links. {total_new_posts} are new. Will scrape up to {max_posts} posts.")
+            logger.info("Found %d blog post links. %d are new. Will scrape up to %d posts.", len(links), total_new_posts, max_posts)
             
-            # Shuffle the links to get random selection
-            random.shuffle(links)
+            # Draw only as many links as we will scrape: mostly new posts, plus a
+            # random_factor share of already scraped posts to refresh
+            new_links = [link_data for link_data in links if link_data.get("link") and link_data["link"] not in already_scraped_links]
+            old_links = [link_data for link_data in links if link_data.get("link") and link_data["link"] in already_scraped_links]
+            k_old = min(len(old_links), round(max_posts * random_factor))
+            k_new = min(len(new_links), max_posts - k_old)
+            candidates = random.sample(new_links, k_new) + random.sample(old_links, k_old)
+            skipped_posts = len(old_links) - k_old
+            logger.info(
+                "Selected %d new posts and %d already scraped posts to refresh; skipping %d already scraped posts.",
+                k_new, k_old, skipped_posts,
+            )
             
-            # Step 2: Visit each link and scrape the full blog post content
-            for i, link_data in enumerate(links):
-                # Stop after reaching the maximum number of posts
-                if processed_posts >= max_posts:
-                    print(f"Reached the maximum of {max_posts} posts processed. Stopping.")
-                    break
-                    
-                title = link_data.get("title", "Unknown Title")
-                link = link_data.get("link", "")
-                
-                if not link:
-                    print(f"Skipping post with missing link: {title}")
-                    continue
-                    
-                # Skip duplicates within current run
-                if link in seen_links:
-                    print(f"Skipping duplicate link in this run: {title}")
-                    continue
-                
-                seen_links.add(link)
-                
-                # For already scraped posts, decide randomly whether to refresh them
-                if link in already_scraped_links:
-                    if random.random() < random_factor:
-                        print(f"Randomly selected to refresh already scraped post: {title}")
-                        # Continue with refreshing this post
-                    else:
-                        print(f"Skipping already scraped post: {title}")
-                        skipped_posts += 1
-                        continue
-                
-                # Delay between requests to avoid rate limits
-                if i > 0:
-                    # Add slight randomness to delay to appear more natural
-                    current_delay = delay_seconds * (0.8 + 0.4 * random.random())
-                    print(f"Waiting {current_delay:.1f} seconds before next request...")
-                    await asyncio.sleep(current_delay)
-                    
-                # Scrape the individual blog post
-                post_data = await scrape_blog_post(crawler, link, title, session_id)
-                
-                # Increment the processed counter regardless of success
-                processed_posts += 1
-                
-                if post_data and all(key in post_data for key in REQUIRED_KEYS):
-                    all_posts.append(post_data)
-                    if link in already_scraped_links:
-                        refreshed_posts += 1
-                        print(f"Successfully refreshed post {processed_posts}/{max_posts}: {title}")
-                    else:
-                        successful_posts += 1
-                        print(f"Successfully scraped new post {processed_posts}/{max_posts}: {title}")
-                    
-                    # Save after each successful post to preserve progress
-                    if len(all_posts) >= 2 or processed_posts >= max_posts:
-                        save_posts_to_csv(all_posts, csv_filename, append=True)
-                        print(f"Saved {len(all_posts)} blog posts to '{csv_filename}' (intermediate save)")
-                        # Clear the list since we've saved them
-                        all_posts = []
-                else:
-                    failed_posts += 1
-                    print(f"Failed to scrape post or missing required data: {title}")
-                    
-                # Debug output to track progress
-                print(f"Progress: {processed_posts}/{max_posts} posts processed ({successful_posts} new, {refreshed_posts} refreshed, {failed_posts} failed)")
+            # Step 2: Visit the links concurrently and scrape the full blog post content
+            await pool.map(worker, candidates)
         
         except Exception as e:
-            print(f"Error during crawling: {str(e)}")
-            # Save what we have so far
-            if all_posts:
-                save_posts_to_csv(all_posts, csv_filename, append=True)
-                print(f"Saved {len(all_posts)} blog posts to '{csv_filename}' after error.")
-
-    # Final save of any remaining posts
-    if all_posts:
-        save_posts_to_csv(all_posts, csv_filename, append=True)
-        print(f"Saved {len(all_posts)} blog posts to '{csv_filename}'.")
+            logger.exception("Error during crawling: %s", e)
+
+        finally:
+            for signum in handled_signals:
+                loop.remove_signal_handler(signum)
+            # Save whatever is still buffered, including after an error
+            await flush_pending()
+            await asyncio.to_thread(close_sink)
+            atexit.unregister(flush_on_exit)
         
-    print(f"Summary: Processed {processed_posts} posts - {successful_posts} new posts successfully scraped, {refreshed_posts} posts refreshed, {skipped_posts} posts skipped, {failed_posts} posts failed.")
+    logger.info(
+        "Summary: Processed %d posts - %d new posts successfully scraped, %d posts refreshed, %d posts skipped, %d posts failed.",
+        processed_posts, successful_posts, refreshed_posts, skipped_posts, failed_posts,
+    )
 
 
 async def main():
     """
     Entry point of the script.
     """
-    # Parse command line arguments
-    parser = argparse.ArgumentParser(description='Scrape blog posts from UpGuard blog')
-    parser.add_argument('--max-posts', type=int, default=10, help='Maximum number of posts to scrape (default: 10)')
-    parser.add_argument('--delay', type=int, default=5, help='Delay between requests in seconds (default: 5)')
-    parser.add_argument('--output', type=str, default='upguard_blog_posts.csv', help='Output CSV file (default: upguard_blog_posts.csv)')
-    parser.add_argument('--random', type=float, default=0.3, help='Random factor for refreshing already scraped posts (0-1, default: 0.3)')
-    
+    # Only read .env when run as a script, importing main has no side effects
+    load_dotenv()
+    logging.basicConfig(
+        level=os.getenv("LOG_LEVEL", "INFO").upper(),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+
     # Parse args only if running from command line
-    import sys
     if len(sys.argv) > 1:
         args = parser.parse_args()
         max_posts = args.max_posts
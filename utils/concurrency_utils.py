@@ -0,0 +1,405 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Mapping, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# Status codes that mean "slow down and try again later"
+RETRYABLE_STATUSES = frozenset({429, 503})
+
+
+@dataclass
+class ScrapeResult:
+    """
+    Outcome of a single page request, fed back into the AutoscaledPool.
+    """
+
+    status: int  # HTTP status code, 0 when the request failed without a response (e.g. timeout)
+    elapsed: float  # Seconds spent on the request
+
+    @property
+    def failed(self) -> bool:
+        """
+        True for responses that indicate the site is being pushed too hard.
+        """
+        return self.status == 0 or self.status == 429 or self.status >= 500
+
+
+class TokenBucket:
+    """
+    Async token bucket used to space out requests to a host.
+
+    Tokens are kept in an asyncio.Queue that a background task refills once
+    every `interval` seconds, so the number of concurrent workers and the
+    request rate can be tuned independently.
+    """
+
+    def __init__(self, interval: float, capacity: int = 1, jitter: float = 0.2):
+        """
+        Args:
+            interval (float): Average number of seconds between two tokens.
+            capacity (int): Maximum number of tokens that can be banked.
+            jitter (float): Relative randomness applied to each refill interval.
+        """
+        self.interval = interval
+        self.jitter = jitter
+        self._tokens = asyncio.Queue(maxsize=capacity)
+        self._tokens.put_nowait(None)  # The first request can go out immediately
+        self._refill_task: Optional[asyncio.Task] = None
+        self._paused_until = 0.0
+
+    async def __aenter__(self) -> "TokenBucket":
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def start(self):
+        """
+        Starts the background refill task.
+        """
+        if self._refill_task is None:
+            self._refill_task = asyncio.create_task(self._refill())
+
+    async def close(self):
+        """
+        Stops the background refill task.
+        """
+        if self._refill_task:
+            self._refill_task.cancel()
+            try:
+                await self._refill_task
+            except asyncio.CancelledError:
+                pass
+            self._refill_task = None
+
+    async def _refill(self):
+        while True:
+            # No tokens are handed out while paused, so requests resume one interval apart
+            if (delay := self._paused_until - time.monotonic()) > 0:
+                await asyncio.sleep(delay)
+                continue
+            # Add slight randomness to the interval to appear more natural
+            if self.interval <= 0:
+                await self._tokens.put(None)
+                continue
+            await asyncio.sleep(self.interval * random.uniform(1 - self.jitter, 1 + self.jitter))
+            if self._paused_until <= time.monotonic():
+                await self._tokens.put(None)
+
+    def pause(self, seconds: float):
+        """
+        Holds back every request for the given number of seconds.
+
+        Args:
+            seconds (float): How long to wait before the next request.
+        """
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def acquire(self):
+        """
+        Wait until the bucket is not paused and a token is available, and consume it.
+        """
+        while True:
+            # Re-check after each wake-up, the pause may have been extended meanwhile
+            while (delay := self._paused_until - time.monotonic()) > 0:
+                await asyncio.sleep(delay)
+            if self._refill_task is None and self.interval <= 0:
+                return
+            await self._tokens.get()
+            if self._paused_until <= time.monotonic():
+                return
+            # Paused while waiting for the token, give it back for when the pause ends
+            try:
+                self._tokens.put_nowait(None)
+            except asyncio.QueueFull:
+                pass
+
+
+def exponential_backoff(attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+    """
+    Returns how long to wait before retrying a rate-limited request.
+
+    Uses "full jitter": a random delay between 0 and `base * 2**attempt`, so
+    workers that were throttled together do not retry in lockstep.
+
+    Args:
+        attempt (int): Number of attempts already made, starting at 0.
+        base (float): Upper bound of the first delay, in seconds.
+        cap (float): Upper bound of any delay, in seconds.
+
+    Returns:
+        float: Seconds to wait.
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def _parse_seconds(value: Optional[str]) -> Optional[float]:
+    """
+    Parses a header holding a delay in seconds, an epoch timestamp or an HTTP date.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            return None
+    # X-RateLimit-Reset is an epoch timestamp on some servers, a delay on others
+    if seconds > 1e9:
+        seconds -= time.time()
+    return max(seconds, 0.0)
+
+
+class HostRateLimiter:
+    """
+    Per-host request spacing driven by the server's rate-limit headers.
+
+    Every host gets its own TokenBucket that starts at `default_interval`.
+    After each response, `update` reads `Retry-After`, `(X-)RateLimit-Remaining`
+    and `(X-)RateLimit-Reset` and spreads the remaining budget over the reset
+    window, or pauses the host until the window resets. Hosts that send no
+    such headers keep the default interval.
+    """
+
+    def __init__(self, default_interval: float, min_interval: float = 0.0):
+        """
+        Args:
+            default_interval (float): Seconds between requests when the server sends no limits.
+            min_interval (float): Never send requests faster than this, whatever the headers say.
+        """
+        self.default_interval = default_interval
+        self.min_interval = min_interval
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    async def __aenter__(self) -> "HostRateLimiter":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        """
+        Stops the refill tasks of every host.
+        """
+        for bucket in self._buckets.values():
+            await bucket.close()
+        self._buckets.clear()
+
+    def _bucket(self, url: str) -> TokenBucket:
+        host = urlparse(url).netloc
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(self.default_interval)
+            bucket.start()
+        return bucket
+
+    async def acquire(self, url: str):
+        """
+        Waits until a request to the host of `url` may be sent.
+
+        Args:
+            url (str): The URL about to be requested.
+        """
+        await self._bucket(url).acquire()
+
+    def update(self, url: str, headers: Optional[Mapping[str, str]]):
+        """
+        Adjusts the rate of a host from the headers of one of its responses.
+
+        Args:
+            url (str): The URL that was requested.
+            headers (Optional[Mapping[str, str]]): Response headers, if available.
+        """
+        bucket = self._bucket(url)
+        headers = {key.lower(): value for key, value in (headers or {}).items()}
+
+        retry_after = _parse_seconds(headers.get("retry-after"))
+        if retry_after:
+            logger.warning("%s asked to retry after %.1fs", urlparse(url).netloc, retry_after)
+            bucket.pause(retry_after)
+
+        remaining = headers.get("ratelimit-remaining", headers.get("x-ratelimit-remaining"))
+        reset = _parse_seconds(headers.get("ratelimit-reset", headers.get("x-ratelimit-reset")))
+        try:
+            remaining = int(remaining) if remaining is not None else None
+        except ValueError:
+            remaining = None
+
+        if remaining is None or reset is None:
+            return
+        if remaining <= 0:
+            bucket.pause(reset)
+            return
+        # Spread what is left of the budget evenly over the rest of the window
+        bucket.interval = max(reset / remaining, self.min_interval)
+
+
+def make_session_pool(session_id: str, size: int) -> asyncio.Queue:
+    """
+    Creates a pool of crawler session identifiers.
+
+    A crawl4ai session maps to a single browser page, so concurrent workers
+    must never share one. Each worker takes an identifier from the pool for the
+    duration of a request and puts it back afterwards, which keeps pages warm
+    without two navigations racing on the same page.
+
+    Args:
+        session_id (str): Prefix used for the generated session identifiers.
+        size (int): Number of sessions in the pool.
+
+    Returns:
+        asyncio.Queue: Queue holding the session identifiers.
+    """
+    sessions = asyncio.Queue()
+    for i in range(size):
+        sessions.put_nowait(f"{session_id}_{i}")
+    return sessions
+
+
+class AutoscaledPool:
+    """
+    Runs coroutines with a concurrency level that adapts to the site's health.
+
+    The pool starts at `desired_concurrency`, adds one slot every
+    `scale_up_interval` seconds while the failure rate stays below
+    `max_failure_rate`, and halves its capacity as soon as rate limiting
+    (429), server errors (5xx) or timeouts are reported through `record`.
+    A task only starts while fewer than `current_concurrency` tasks are running,
+    so a scale-down applies as soon as running tasks finish.
+    """
+
+    def __init__(
+        self,
+        desired_concurrency: int = 4,
+        min_concurrency: int = 1,
+        max_concurrency: int = 20,
+        sample_interval: float = 15.0,
+        scale_up_interval: float = 60.0,
+        max_failure_rate: float = 0.05,
+        window_size: int = 200,
+    ):
+        """
+        Args:
+            desired_concurrency (int): Concurrency level to start with.
+            min_concurrency (int): Lower bound for the concurrency level.
+            max_concurrency (int): Upper bound for the concurrency level.
+            sample_interval (float): Seconds between two health checks.
+            scale_up_interval (float): Minimum seconds between two scale-up steps.
+            max_failure_rate (float): Failure rate (0-1) below which the pool may grow.
+            window_size (int): Number of recent results used to compute the failure rate.
+        """
+        self.min_concurrency = max(min_concurrency, 1)
+        self.max_concurrency = max(max_concurrency, self.min_concurrency)
+        self.current_concurrency = min(max(desired_concurrency, self.min_concurrency), self.max_concurrency)
+        self.sample_interval = sample_interval
+        self.scale_up_interval = scale_up_interval
+        self.max_failure_rate = max_failure_rate
+
+        self._slots = asyncio.Condition()  # Notified whenever a task may start
+        self._in_flight = 0
+        self._results = deque(maxlen=window_size)
+        self._failures_since_sample = 0
+        self._last_scale_up = time.monotonic()
+        self._tasks: List[asyncio.Task] = []
+
+    def record(self, result: ScrapeResult):
+        """
+        Reports the outcome of a request to the pool.
+
+        Args:
+            result (ScrapeResult): The outcome of the request.
+        """
+        self._results.append(result)
+        if result.failed:
+            self._failures_since_sample += 1
+
+    def _scale_down(self):
+        target = max(self.current_concurrency // 2, self.min_concurrency)
+        # Running tasks finish, but no new one starts until fewer than `target` are running
+        logger.info("Scaling down concurrency from %d to %d", self.current_concurrency, target)
+        self.current_concurrency = target
+
+    async def _scale_up(self):
+        self.current_concurrency += 1
+        self._last_scale_up = time.monotonic()
+        logger.info("Scaling up concurrency to %d", self.current_concurrency)
+        async with self._slots:
+            self._slots.notify()
+
+    async def _monitor(self):
+        while True:
+            await asyncio.sleep(self.sample_interval)
+
+            failures = sum(1 for result in self._results if result.failed)
+            failure_rate = failures / len(self._results) if self._results else 0.0
+
+            if self._failures_since_sample and self.current_concurrency > self.min_concurrency:
+                self._scale_down()
+            elif (
+                failure_rate < self.max_failure_rate
+                and self.current_concurrency < self.max_concurrency
+                and time.monotonic() - self._last_scale_up >= self.scale_up_interval
+            ):
+                await self._scale_up()
+
+            self._failures_since_sample = 0
+
+    def stop(self):
+        """
+        Cancels every task that has not finished yet, except the calling one.
+        """
+        current = asyncio.current_task()
+        for task in self._tasks:
+            if task is not current:
+                task.cancel()
+
+    async def map(self, fn: Callable[[Any], Awaitable[Any]], items: Iterable[Any]) -> List[Any]:
+        """
+        Applies `fn` to every item while respecting the current concurrency level.
+
+        Args:
+            fn (Callable[[Any], Awaitable[Any]]): Coroutine function to run for each item.
+            items (Iterable[Any]): The items to process.
+
+        Returns:
+            List[Any]: The results in input order, None for tasks cancelled by `stop`.
+        """
+        async def run(item):
+            async with self._slots:
+                await self._slots.wait_for(lambda: self._in_flight < self.current_concurrency)
+                self._in_flight += 1
+            try:
+                return await fn(item)
+            except Exception:
+                self.stop()
+                raise
+            finally:
+                async with self._slots:
+                    self._in_flight -= 1
+                    self._slots.notify()
+
+        monitor = asyncio.create_task(self._monitor())
+        self._tasks = [asyncio.create_task(run(item)) for item in items]
+        try:
+            results = await asyncio.gather(*self._tasks, return_exceptions=True)
+        finally:
+            self.stop()
+            monitor.cancel()
+            await asyncio.gather(*self._tasks, monitor, return_exceptions=True)
+            self._tasks = []
+
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        return [None if isinstance(result, asyncio.CancelledError) else result for result in results]
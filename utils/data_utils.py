@@ -1,18 +1,51 @@
 import csv
+import logging
 import os
+import re
 import tempfile
 import shutil
+from typing import Dict, Iterable, Iterator, Optional, Set
 
 from models.venue import BlogPost
 
+logger = logging.getLogger(__name__)
+
+# CSV columns, computed once instead of on every save
+BLOG_POST_FIELDS = tuple(BlogPost.model_fields.keys())
+
+# Size of the user-space write buffer used for CSV files. Progress is preserved by
+# the caller's save cadence, not by flushing every row, so let the OS block-buffer.
+CSV_BUFFER_SIZE = 4 * 1024 * 1024
+
+_WS_RE = re.compile(r'\s+')
+# Typographic quotes and dashes mapped to their ASCII equivalents
+_PUNCTUATION_MAP = str.maketrans({
+    "\u2018": "'", "\u2019": "'", "\u201c": '"', "\u201d": '"', "\u2013": "-", "\u2014": "-",
+})
+
+
+def title_fingerprint(title: str) -> str:
+    """
+    Normalizes a title so that trivial variants compare equal.
+
+    Case, typographic quotes and dashes, and runs of whitespace are ignored.
+
+    Args:
+        title (str): The title of the blog post.
+
+    Returns:
+        str: The normalized title.
+    """
+    return _WS_RE.sub(' ', title.casefold().translate(_PUNCTUATION_MAP)).strip()
+
 
 def is_duplicate_post(post_title: str, seen_titles: set) -> bool:
     """
     Check if a blog post with the given title has already been seen.
     
     Args:
-        post_title (str): The title of the blog post.
-        seen_titles (set): Set of post titles that have already been seen.
+        post_title (str): The title of the blog post, or its title_fingerprint.
+        seen_titles (set): Set of post titles (or fingerprints) that have already been seen.
         
     Returns:
         bool: True if the post title is in the set of seen titles, False otherwise.
@@ -20,84 +53,252 @@ def is_duplicate_post(post_title: str, seen_titles: set) -> bool:
     return post_title in seen_titles
 
 
-def is_complete_post(post: dict, required_keys: list) -> bool:
+def is_complete_post(post: dict, required_keys: Iterable[str]) -> bool:
     """
     Check if a blog post has all the required keys.
     
     Args:
         post (dict): The blog post data.
-        required_keys (list): List of required keys.
+        required_keys (Iterable[str]): Required keys, ideally as a frozenset
+            (e.g. config.REQUIRED_KEYS_FS) to avoid converting them on every call.
         
     Returns:
-        bool: True if the post has all required keys, False otherwise.
+        bool: True if the post has all required keys with non-empty values, False otherwise.
+    """
+    if not isinstance(required_keys, frozenset):
+        required_keys = frozenset(required_keys)
+    # Cheap membership check first, so incomplete posts exit after one C-level call
+    if not required_keys.issubset(post):
+        return False
+    return all(post[key] for key in required_keys)
+
+
+def _sync(file):
+    """
+    Flush a file and ask the OS to write it to disk.
+    
+    Args:
+        file: An open file object.
+    """
+    file.flush()
+    os.fsync(file.fileno())
+
+
+def _iter_rows(posts: Iterable[dict]) -> Iterator[list]:
+    """
+    Lazily convert blog posts into CSV rows ordered like BLOG_POST_FIELDS.
+    
+    Args:
+        posts (Iterable[dict]): Blog post dictionaries.
+        
+    Yields:
+        list: The values of one post, with "" for missing fields.
+    """
+    for post in posts:
+        yield [post.get(key, "") for key in BLOG_POST_FIELDS]
+
+
+class CsvSink:
+    """
+    Writes blog posts to a CSV file through a single handle kept open for a whole crawl.
+    
+    Posts are deduplicated by link: new posts are appended, and the file is only
+    rewritten when an existing post is updated. The stored rows are read from the
+    file the first time that happens, appending only needs the set of stored links.
+    Rewrites go through a temporary file that replaces the CSV once complete, so an
+    interrupted crawl never leaves a truncated file behind. Rows go through a large
+    buffer that is flushed at the end of each `append`, and are not fsynced unless
+    `close(durable=True)` is used.
     """
-    return all(key in post and post[key] for key in required_keys)
 
+    def __init__(self, filename: str, links: Optional[Set[str]] = None):
+        """
+        Args:
+            filename (str): The name of the CSV file to write to.
+            links (Optional[Set[str]]): Links already stored in the file, e.g. the set
+                or BloomSet returned by load_existing_posts. The links of written posts
+                are added to it. Read from the file on first use when omitted.
+        """
+        self.filename = filename
+        self._file = None
+        self._writer = None
+        self._links = links
+        # Stored rows by link, only read when a stored post has to be updated
+        self._rows = None
+        # Without a complete copy of the rows, rewriting the file would drop some, so only append
+        self._can_rewrite = True
+
+    def _read_rows(self) -> Optional[Dict[str, dict]]:
+        """
+        Reads the stored rows by link, or returns None if the file cannot be read.
+        """
+        rows = {}
+        if self._file is not None:
+            # Rows appended through the open handle have to be read back too
+            self._file.flush()
+        if not os.path.exists(self.filename):
+            return rows
+        try:
+            with open(self.filename, mode='r', newline='', encoding='utf-8', buffering=CSV_BUFFER_SIZE) as file:
+                for row in csv.DictReader(file):
+                    if row.get('link'):
+                        rows[row['link']] = row
+        except Exception as e:
+            logger.error("Error reading existing posts: %s", e)
+            self._can_rewrite = False
+            return None
+        return rows
+
+    def _known_links(self) -> Set[str]:
+        if self._links is None:
+            self._rows = self._read_rows()
+            self._links = set(self._rows or ())
+        return self._links
+
+    def _open(self, mode: str):
+        self._close_file()
+        needs_header = mode == "w" or not os.path.exists(self.filename) or os.path.getsize(self.filename) == 0
+        self._file = open(self.filename, mode=mode, newline="", encoding="utf-8", buffering=CSV_BUFFER_SIZE)
+        self._writer = csv.writer(self._file)
+        if needs_header:
+            self._writer.writerow(BLOG_POST_FIELDS)
+
+    def _rewrite(self, posts: Iterable[dict]):
+        """
+        Replaces the file with the given posts and reopens it for appending.
+        """
+        self._close_file()
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(self.filename)),
+            prefix=f".{os.path.basename(self.filename)}.",
+            suffix=".tmp",
+        )
+        try:
+            with open(fd, mode="w", newline="", encoding="utf-8", buffering=CSV_BUFFER_SIZE) as file:
+                writer = csv.writer(file)
+                writer.writerow(BLOG_POST_FIELDS)
+                writer.writerows(_iter_rows(posts))
+                # Otherwise a power loss right after the rename can leave an empty file
+                _sync(file)
+            if os.path.exists(self.filename):
+                # mkstemp creates files only readable by their owner
+                shutil.copymode(self.filename, tmp_path)
+            os.replace(tmp_path, self.filename)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        self._open("a")
+
+    def _close_file(self, durable: bool = False):
+        if self._file is None:
+            return
+        if durable:
+            _sync(self._file)
+        self._file.close()
+        self._file = None
+        self._writer = None
+
+    def append(self, posts: list):
+        """
+        Add blog posts to the CSV file, updating posts whose link is already stored.
+        
+        Args:
+            posts (list): List of blog post dictionaries.
+        """
+        if not posts:
+            logger.info("No posts to save.")
+            return
+
+        # Deduplicate the batch by link, the last copy of a post wins
+        batch = {post.get('link'): post for post in posts}
+        links = self._known_links()
+        has_stored = self._can_rewrite and any(link and link in links for link in batch)
+        if has_stored and self._rows is None:
+            self._rows = self._read_rows()
+            has_stored = self._rows is not None
+
+        if has_stored:
+            # A BloomSet may report unseen links as stored, count against the rows instead
+            updated_count = sum(1 for link in batch if link in self._rows)
+            self._rows.update(batch)
+            # Existing rows changed, so the whole file has to be written back. The
+            # handle stays open afterwards and later posts are appended to it.
+            self._rewrite(self._rows.values())
+        else:
+            updated_count = 0
+            if self._rows is not None:
+                self._rows.update(batch)
+            if self._file is None:
+                self._open("a")
+            self._writer.writerows(_iter_rows(batch.values()))
+
+        for link in batch:
+            if link:
+                links.add(link)
+        # Hand the batch to the OS, so a crash after this point does not lose it
+        self.flush()
+
+        logger.info(
+            "Updated CSV file '%s': %d posts added, %d posts updated.",
+            self.filename, len(batch) - updated_count, updated_count,
+        )
+
+    def flush(self):
+        """
+        Hand the buffered rows to the OS, without fsyncing them.
+        """
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self, durable: bool = False):
+        """
+        Flush and close the CSV file. The sink can still be appended to afterwards.
+        
+        Args:
+            durable (bool): Whether to fsync the file once before closing it.
+        """
+        self._close_file(durable)
 
-def save_posts_to_csv(posts: list, filename: str, append: bool = False):
+    def __enter__(self) -> "CsvSink":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def save_posts_to_csv(posts: list, filename: str, append: bool = False, durable: bool = False):
     """
     Save a list of blog posts to a CSV file.
     
+    Convenience wrapper for one-off saves; use a CsvSink to save several batches
+    to the same file.
+    
     Args:
         posts (list): List of blog post dictionaries.
         filename (str): The name of the file to save to.
         append (bool): Whether to append to an existing file (True) or overwrite (False).
+        durable (bool): Whether to fsync the file once before closing it.
     """
     if not posts:
-        print("No posts to save.")
+        logger.info("No posts to save.")
         return
 
-    # Use field names from the BlogPost model
-    fieldnames = BlogPost.model_fields.keys()
-    
-    # Check if the file exists and we should append
-    file_exists = os.path.exists(filename)
-    
-    # If not appending or file doesn't exist, just write directly
-    if not append or not file_exists:
-        with open(filename, mode="w", newline="", encoding="utf-8") as file:
-            writer = csv.DictWriter(file, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(posts)
-        print(f"Saved {len(posts)} blog posts to '{filename}'.")
+    # If not appending, just write directly
+    if not append:
+        with open(filename, mode="w", newline="", encoding="utf-8", buffering=CSV_BUFFER_SIZE) as file:
+            writer = csv.writer(file)
+            writer.writerow(BLOG_POST_FIELDS)
+            writer.writerows(_iter_rows(posts))
+            if durable:
+                _sync(file)
+        logger.info("Saved %d blog posts to '%s'.", len(posts), filename)
         return
-    
-    # Handle appending with deduplication
-    # Load existing posts and track by link
-    existing_posts = {}
+
+    sink = CsvSink(filename)
     try:
-        with open(filename, mode='r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                if 'link' in row and row['link']:
-                    existing_posts[row['link']] = row
-    except Exception as e:
-        print(f"Error reading existing posts: {str(e)}")
-        # Fall back to simple append if there's an error
-        with open(filename, mode="a", newline="", encoding="utf-8") as file:
-            writer = csv.DictWriter(file, fieldnames=fieldnames)
-            writer.writerows(posts)
-        print(f"Appended {len(posts)} blog posts to '{filename}'.")
-        return
-    
-    # Process new posts - update existing entries or add new ones
-    updated_count = 0
-    added_count = 0
-    
-    for post in posts:
-        if post.get('link') in existing_posts:
-            # Update the existing entry
-            existing_posts[post['link']] = post
-            updated_count += 1
-        else:
-            # Add new entry
-            existing_posts[post['link']] = post
-            added_count += 1
-    
-    # Write back all posts
-    with open(filename, mode="w", newline="", encoding="utf-8") as file:
-        writer = csv.DictWriter(file, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(existing_posts.values())
-    
-    print(f"Updated CSV file '{filename}': {added_count} posts added, {updated_count} posts updated.")
+        sink.append(posts)
+    finally:
+        sink.close(durable)
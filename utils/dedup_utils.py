@@ -0,0 +1,191 @@
+import logging
+import os
+import struct
+from typing import Iterable, Optional, Set, Tuple, Union
+
+try:
+    from pybloom_live import BloomFilter
+except ImportError:  # Optional dependency, plain sets are used without it
+    BloomFilter = None
+
+logger = logging.getLogger(__name__)
+
+# Above this many links, a Bloom filter is used instead of a set of strings
+BLOOM_THRESHOLD = 50_000
+BLOOM_MIN_CAPACITY = 1_000_000
+BLOOM_ERROR_RATE = 1e-4
+
+# Header of the on-disk index: magic, capacity, number of items, then the size and
+# mtime (ns) of the CSV file it was built from. Bump the magic whenever the layout
+# changes so that stale files are rebuilt from the CSV.
+_INDEX_MAGIC = b"CRWLBLM2"
+_INDEX_HEADER = struct.Struct("<8sQQQQ")
+
+
+class BloomSet:
+    """
+    Set-like container of links backed by a Bloom filter.
+
+    Uses a few MB for millions of links instead of one Python string per link.
+    Lookups never miss a link that was added, but roughly one unseen link in
+    10,000 is reported as present (i.e. treated as already scraped).
+    """
+
+    def __init__(self, items: Iterable[str] = (), capacity: Optional[int] = None, error_rate: float = BLOOM_ERROR_RATE):
+        """
+        Args:
+            items (Iterable[str]): Initial links.
+            capacity (Optional[int]): Number of links the filter is sized for.
+                Defaults to 4x the number of initial links, with a minimum of 1M.
+            error_rate (float): Target false positive rate.
+        """
+        if BloomFilter is None:
+            raise ImportError("pybloom-live is required to use BloomSet")
+
+        if capacity is None:
+            size = len(items) if hasattr(items, "__len__") else 0
+            capacity = max(size * 4, BLOOM_MIN_CAPACITY)
+
+        self._bloom = BloomFilter(capacity=capacity, error_rate=error_rate)
+        for item in items:
+            self._bloom.add(item)
+
+    def __contains__(self, item: str) -> bool:
+        return item in self._bloom
+
+    def __len__(self) -> int:
+        return len(self._bloom)
+
+    def add(self, item: str):
+        """
+        Adds a link to the set.
+
+        Args:
+            item (str): The link to add.
+        """
+        self._bloom.add(item)
+
+    def save(self, path: str, stamp: Tuple[int, int] = (0, 0)):
+        """
+        Writes the set to a file, replacing it atomically.
+
+        Args:
+            path (str): Path of the file to write.
+            stamp (Tuple[int, int]): Size and mtime (ns) of the file the links
+                were read from, checked by `load`.
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(_INDEX_HEADER.pack(_INDEX_MAGIC, self._bloom.capacity, len(self._bloom), *stamp))
+            self._bloom.tofile(file)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, stamp: Optional[Tuple[int, int]] = None) -> "BloomSet":
+        """
+        Reads a set written by `save`.
+
+        Args:
+            path (str): Path of the file to read.
+            stamp (Optional[Tuple[int, int]]): Expected size and mtime (ns) of the
+                file the links were read from, None to skip the check.
+
+        Returns:
+            BloomSet: The loaded set.
+
+        Raises:
+            ValueError: If the file is not a valid index.
+        """
+        if BloomFilter is None:
+            raise ImportError("pybloom-live is required to use BloomSet")
+
+        with open(path, "rb") as file:
+            try:
+                magic, capacity, n_items, *saved_stamp = _INDEX_HEADER.unpack(file.read(_INDEX_HEADER.size))
+                bloom = BloomFilter.fromfile(file)
+            except struct.error as e:
+                raise ValueError(f"Truncated index file: {path}") from e
+
+        if magic != _INDEX_MAGIC or bloom.capacity != capacity or bloom.count != n_items:
+            raise ValueError(f"Invalid or outdated index file: {path}")
+        if stamp is not None and tuple(saved_stamp) != tuple(stamp):
+            raise ValueError(f"Index file does not match the current CSV file: {path}")
+
+        links = cls.__new__(cls)
+        links._bloom = bloom
+        return links
+
+
+def compact_link_set(links: Set[str]) -> Union[Set[str], BloomSet]:
+    """
+    Returns a memory-efficient equivalent of a large set of links.
+
+    Args:
+        links (Set[str]): The links to compact.
+
+    Returns:
+        Union[Set[str], BloomSet]: A BloomSet when the set is larger than
+            BLOOM_THRESHOLD and pybloom-live is installed, the set itself otherwise.
+    """
+    if len(links) <= BLOOM_THRESHOLD or BloomFilter is None:
+        return links
+    return BloomSet(links)
+
+
+def index_path(csv_filename: str) -> str:
+    """
+    Returns the path of the on-disk link index kept next to a CSV file.
+
+    Args:
+        csv_filename (str): Path to the CSV file.
+
+    Returns:
+        str: Path to the index file.
+    """
+    return f"{csv_filename}.bloom"
+
+
+def _csv_stamp(csv_filename: str) -> Tuple[int, int]:
+    """
+    Returns the size and mtime (ns) of a CSV file, which identify the version of
+    the file an index was built from.
+    """
+    stat = os.stat(csv_filename)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def load_link_index(csv_filename: str) -> Optional[BloomSet]:
+    """
+    Loads the link index of a CSV file if it was saved for the current version of the file.
+
+    Args:
+        csv_filename (str): Path to the CSV file.
+
+    Returns:
+        Optional[BloomSet]: The index, or None if the CSV file has to be scanned.
+    """
+    path = index_path(csv_filename)
+    if BloomFilter is None or not os.path.exists(path):
+        return None
+
+    try:
+        return BloomSet.load(path, _csv_stamp(csv_filename))
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring link index %s: %s", path, e)
+        return None
+
+
+def save_link_index(links: Union[Set[str], BloomSet], csv_filename: str):
+    """
+    Saves the link index of a CSV file. Plain sets are cheap to rebuild from the
+    CSV file, so only BloomSets are written.
+
+    The index records the size and mtime of the CSV file, so it must be saved
+    after the rows it contains have been flushed to the file.
+
+    Args:
+        links (Union[Set[str], BloomSet]): The links stored in the CSV file.
+        csv_filename (str): Path to the CSV file.
+    """
+    if isinstance(links, BloomSet):
+        links.save(index_path(csv_filename), _csv_stamp(csv_filename))
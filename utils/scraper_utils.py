@@ -1,19 +1,115 @@
+import asyncio
+import hashlib
 import json
+import logging
 import os
 import re
 import time
-from typing import List, Set, Tuple, Dict, Optional
+from collections import Counter
+from operator import itemgetter
+from typing import AsyncIterator, Callable, List, Set, Tuple, Dict, Optional, Union
+from urllib.parse import urljoin
 
 from crawl4ai import (
     AsyncWebCrawler,
     BrowserConfig,
     CacheMode,
     CrawlerRunConfig,
+    CrawlResult,
     LLMExtractionStrategy,
 )
 
+try:
+    import orjson
+    _loads = orjson.loads  # Accepts str and bytes, several times faster than json.loads
+except ImportError:  # Optional dependency, fall back to the standard library
+    _loads = json.loads
+
+try:
+    import diskcache
+except ImportError:  # Optional dependency, posts are always scraped without it
+    diskcache = None
+
+# HTML parsers, fastest first. lxml is installed with crawl4ai, the regexes
+# below are only used if neither parser can be imported.
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    HTMLParser = None
+try:
+    from lxml import etree as lxml_etree
+    from lxml import html as lxml_html
+except ImportError:
+    lxml_etree = lxml_html = None
+
 from models.venue import BlogPost
-from utils.data_utils import is_complete_post, is_duplicate_post
+from utils.concurrency_utils import (
+    RETRYABLE_STATUSES,
+    HostRateLimiter,
+    ScrapeResult,
+    exponential_backoff,
+    make_session_pool,
+)
+from utils.data_utils import is_complete_post, is_duplicate_post, title_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Relative links found on the blog are resolved against this URL
+_SITE_ROOT = "https://www.upguard.com/"
+
+# Chromium profile reused across runs when BROWSER_PERSISTENT_PROFILE is set, so
+# cookies and the HTTP cache survive restarts
+BROWSER_PROFILE_DIR = "./.pw_profile"
+
+# On-disk cache of scraped posts, so that re-runs skip pages fetched recently
+POST_CACHE_DIR = ".crawl_cache"
+POST_CACHE_TTL = 24 * 60 * 60  # Seconds
+_post_cache = None
+
+# Body of posts whose content could not be found, never cached
+_NO_CONTENT_BODY = "Could not extract blog post content."
+
+# Patterns are compiled once at import time instead of on every call
+_ARTICLE_RE = re.compile(r'<article[^>]*>(.*?)</article>', re.DOTALL)
+_POST_CONTENT_RE = re.compile(r'<div[^>]*class="[^"]*post-content[^"]*"[^>]*>(.*?)</div>', re.DOTALL)
+_BLOG_CONTENT_RE = re.compile(r'<div[^>]*class="[^"]*blog-content[^"]*"[^>]*>(.*?)</div>', re.DOTALL)
+_CONTENT_DIV_RE = re.compile(r'<div[^>]*class="[^"]*content[^"]*"[^>]*>(.*?)</div>', re.DOTALL)
+# Containers tried, in order, when summarising a page and when looking for paragraphs
+_MAIN_CONTENT_PATTERNS = (_ARTICLE_RE, _POST_CONTENT_RE, _BLOG_CONTENT_RE, _CONTENT_DIV_RE)
+_PARAGRAPH_CONTAINER_PATTERNS = (_BLOG_CONTENT_RE, _POST_CONTENT_RE, _ARTICLE_RE, _CONTENT_DIV_RE)
+
+_H1_RE = re.compile(r'<h1[^>]*>(.*?)</h1>', re.DOTALL)
+_TITLE_RE = re.compile(r'<title[^>]*>(.*?)</title>', re.DOTALL)
+_OG_TITLE_RE = re.compile(r'<meta\s+property="og:title"\s+content="([^"]+)"')
+_TITLE_PATTERNS = (_H1_RE, _TITLE_RE, _OG_TITLE_RE)
+
+_PARAGRAPH_RE = re.compile(r'<p[^>]*>(.*?)</p>', re.DOTALL)
+_SCRIPT_RE = re.compile(r'<script[^>]*>.*?</script>', re.DOTALL)
+_STYLE_RE = re.compile(r'<style[^>]*>.*?</style>', re.DOTALL)
+_TAG_STRIP_RE = re.compile(r'<[^>]+>')
+_WS_RE = re.compile(r'\s+')
+
+_BLOG_LINK_RE = re.compile(r'<a\s+[^>]*href="([^"]*(?:\/blog\/[^"]*|\/blog\/[^\/]+\/[^"]*))"\s*[^>]*>(.*?)<\/a>', re.DOTALL)
+# Characters of HTML parsed by extract_main_content, from the start of the article
+MAX_HTML_SCAN_CHARS = 64 * 1024
+
+# The article fast path of extract_blog_post_content keeps this many paragraphs,
+# and falls back to the pattern cascade when they hold fewer characters than this
+_FAST_PATH_MAX_PARAGRAPHS = 5
+_FAST_PATH_MIN_BODY_CHARS = 100
+_fast_path_stats = Counter()
+
+# Link texts containing any of these words are pagination/navigation, not blog posts
+_NAV_RE = re.compile(r'(?i)\b(?:next|previous|all posts|view all)\b')
+
+# DOM equivalents of _MAIN_CONTENT_PATTERNS, for selectolax and lxml
+_MAIN_CONTENT_SELECTORS = ('article', 'div[class*="post-content"]', 'div[class*="blog-content"]', 'div[class*="content"]')
+_MAIN_CONTENT_XPATHS = (
+    '//article',
+    '//div[contains(@class, "post-content")]',
+    '//div[contains(@class, "blog-content")]',
+    '//div[contains(@class, "content")]',
+)
 
 
 def get_browser_config() -> BrowserConfig:
@@ -23,93 +119,388 @@ def get_browser_config() -> BrowserConfig:
     Returns:
         BrowserConfig: The configuration settings for the browser.
     """
+    # Skip GPU rendering and shared-memory limits that slow down headless pages
+    extra_args = ["--disable-gpu", "--disable-dev-shm-usage"]
+    # The sandbox isolates the external pages we load, only turn it off where Chromium
+    # cannot start with it (e.g. as root in some containers)
+    if os.getenv("BROWSER_NO_SANDBOX", "").lower() in ("1", "true", "yes"):
+        extra_args.append("--no-sandbox")
+
+    # A persistent context makes crawl4ai start Chromium as a managed browser, which
+    # ignores extra_args and listens on the fixed CDP port 9222, so it is opt-in
+    persistent = os.getenv("BROWSER_PERSISTENT_PROFILE", "").lower() in ("1", "true", "yes")
+
     # https://docs.crawl4ai.com/core/browser-crawler-config/
     return BrowserConfig(
         browser_type="chromium",  # Type of browser to simulate
-        headless=False,  # Whether to run in headless mode (no GUI)
-        verbose=True,  # Enable verbose logging
+        headless=True,  # Whether to run in headless mode (no GUI)
+        verbose=logger.isEnabledFor(logging.DEBUG),  # Browser logs only when debugging
+        use_persistent_context=persistent,  # Keep one browser context (cookies, cache) across requests and runs
+        user_data_dir=BROWSER_PROFILE_DIR if persistent else None,  # Where the persistent context is stored
+        extra_args=extra_args,
     )
 
 
-def get_content_extraction_strategy(max_tokens: int = 4000) -> LLMExtractionStrategy:
+# JSON schema of the extracted data, built once instead of for every strategy
+_BLOGPOST_SCHEMA = BlogPost.model_json_schema()
+
+# Static part of every extraction prompt. Kept as a single constant so that each
+# request sends exactly the same text, which is what provider-side prompt caches key on.
+_EXTRACTION_INSTRUCTION = (
+    "Extract the blog post content with:\n"
+    "1. title: The title of the blog post\n"
+    "2. body: A brief summary of the main points (1 paragraph only)\n"
+    "3. link: The current URL of the blog post\n"
+    "Be very concise. Focus only on extracting the main article content, ignoring navigation, headers, footers, etc."
+)
+
+# Prompt used when several posts are sent in one request, see extract_blog_posts_batch
+_BATCH_EXTRACTION_INSTRUCTION = (
+    "The content holds several blog posts, each one starting with a '--- POST k ---' line and its URL.\n"
+    "Return a JSON array with one object per POST k, preserving order, with:\n"
+    "1. title: The title of the blog post\n"
+    "2. body: A brief summary of the main points (1 paragraph only)\n"
+    "3. link: The URL given for the post\n"
+    "Be very concise. Focus only on extracting the main article content, ignoring navigation, headers, footers, etc."
+)
+
+
+# Models used for extraction, cheapest first. Both have a 128k context window.
+SMALL_MODEL = "groq/llama-3.1-8b-instant"
+LARGE_MODEL = "groq/llama-3.3-70b-versatile"
+# Prompts longer than this (more than about 4 posts in a batch) go to LARGE_MODEL,
+# the small model tends to merge or drop posts in long multi-post prompts
+SMALL_MODEL_MAX_CHARS = 8000
+
+
+def _pick_model(content_length: Optional[int] = None, escalate: bool = False) -> str:
+    """
+    Picks the cheapest model that can handle an extraction.
+
+    Args:
+        content_length (Optional[int]): Number of characters sent to the model, if known.
+        escalate (bool): True when retrying after the output failed schema validation.
+
+    Returns:
+        str: The LiteLLM provider/model name.
+    """
+    if escalate or (content_length is not None and content_length > SMALL_MODEL_MAX_CHARS):
+        return LARGE_MODEL
+    return SMALL_MODEL
+
+
+def get_content_extraction_strategy(
+    max_tokens: int = 4000,
+    content_length: Optional[int] = None,
+    escalate: bool = False,
+    instruction: str = _EXTRACTION_INSTRUCTION,
+    apply_chunking: bool = True,
+) -> LLMExtractionStrategy:
     """
     Returns the configuration for extracting content from individual blog posts.
 
     Args:
         max_tokens (int): Maximum token limit to use for content extraction.
+        content_length (Optional[int]): Length of the content to extract from, used
+            to send long prompts to the larger model.
+        escalate (bool): Use a larger model, e.g. when retrying after the previous
+            output did not contain the required keys.
+        instruction (str): Prompt sent with the content. Defaults to the single post prompt.
+        apply_chunking (bool): Split long content into several requests. Disable it
+            when the content must reach the model in one piece.
 
     Returns:
         LLMExtractionStrategy: The settings for how to extract blog post content using LLM.
     """
     # https://docs.crawl4ai.com/api/strategies/#llmextractionstrategy
     return LLMExtractionStrategy(
-        # Using a smaller model to avoid rate limits
-        provider="groq/llama3-8b-8192",  # Name of the LLM provider
+        # Using the smallest model that fits the content to avoid rate limits and cost
+        provider=_pick_model(content_length, escalate),  # Name of the LLM provider
         api_token=os.getenv("GROQ_API_KEY"),  # API token for authentication
-        schema=BlogPost.model_json_schema(),  # JSON schema of the data model
+        schema=_BLOGPOST_SCHEMA,  # JSON schema of the data model
         extraction_type="schema",  # Type of extraction to perform
-        instruction=(
-            "Extract the blog post content with:\n"
-            "1. title: The title of the blog post\n"
-            "2. body: A brief summary of the main points (1 paragraph only)\n"
-            "3. link: The current URL of the blog post\n"
-            "Be very concise. Focus only on extracting the main article content, ignoring navigation, headers, footers, etc."
-        ),
+        instruction=instruction,  # Byte-identical across calls so providers can cache it
         input_format="markdown",  # Format of the input content
+        apply_chunking=apply_chunking,  # Whether long content may be split across requests
         max_tokens=max_tokens,  # Limit token usage
-        verbose=True,  # Enable verbose logging
+        verbose=logger.isEnabledFor(logging.DEBUG),  # Per-call logs only when debugging
+    )
+
+
+def _cached_tokens(usage) -> int:
+    """
+    Returns the number of prompt tokens served from the provider's prompt cache.
+    """
+    details = getattr(usage, "prompt_tokens_details", None) or {}
+    if not isinstance(details, dict):
+        details = vars(details)
+    return details.get("cached_tokens") or 0
+
+
+def _usage_cost(model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    """
+    Returns the cost in USD of some token usage, or None if LiteLLM has no price for the model.
+    """
+    try:
+        import litellm  # Installed with crawl4ai, only needed for reporting
+
+        prompt_cost, completion_cost = litellm.cost_per_token(
+            model=model, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens
+        )
+    except Exception:
+        return None
+    return prompt_cost + completion_cost
+
+
+def report_llm_usage(llm_strategy: LLMExtractionStrategy) -> Dict[str, float]:
+    """
+    Logs and returns the token usage of an LLM strategy, including prompt cache hits.
+
+    Args:
+        llm_strategy (LLMExtractionStrategy): The strategy used for extraction.
+
+    Returns:
+        Dict[str, float]: Number of requests, prompt, cached prompt and completion
+            tokens, and the estimated cost in USD (None if the model has no known price).
+    """
+    usages = getattr(llm_strategy, "usages", [])
+    report = {
+        "requests": len(usages),
+        "prompt_tokens": sum(usage.prompt_tokens or 0 for usage in usages),
+        "cached_tokens": sum(_cached_tokens(usage) for usage in usages),
+        "completion_tokens": sum(usage.completion_tokens or 0 for usage in usages),
+    }
+    report["cost_usd"] = _usage_cost(
+        getattr(llm_strategy, "provider", ""), report["prompt_tokens"], report["completion_tokens"]
+    )
+    hit_rate = report["cached_tokens"] / report["prompt_tokens"] if report["prompt_tokens"] else 0.0
+    cost = f", ${report['cost_usd']:.4f}" if report["cost_usd"] is not None else ""
+    logger.info(
+        "LLM usage: %d requests, %d prompt tokens (%d cached, %.0f%%), %d completion tokens%s",
+        report["requests"], report["prompt_tokens"], report["cached_tokens"], hit_rate * 100,
+        report["completion_tokens"], cost,
     )
+    return report
+
+
+def _parse_extracted_content(extracted_content: Union[str, bytes, list, dict]) -> Union[list, dict]:
+    """
+    Decodes the output of an extraction strategy, unless it is already decoded.
+
+    Args:
+        extracted_content (Union[str, bytes, list, dict]): JSON text, or the parsed value.
+
+    Returns:
+        Union[list, dict]: The parsed value.
+    """
+    if isinstance(extracted_content, (list, dict)):
+        return extracted_content
+    return _loads(extracted_content)  # orjson and json both accept str and bytes
+
+
+def _html_to_text(html_content: str) -> str:
+    """
+    Replaces tags with spaces and collapses whitespace.
+
+    Two simple substitutions are faster here than one combined tag-or-whitespace
+    pattern, whose alternation is retried at every character.
+    """
+    return _WS_RE.sub(' ', _TAG_STRIP_RE.sub(' ', html_content)).strip()
+
+
+def _parse_lxml(html_content: str):
+    """
+    Parses HTML with lxml, returning None for documents lxml rejects (e.g. empty ones).
+    """
+    try:
+        return lxml_html.fromstring(html_content)
+    except (ValueError, lxml_etree.ParserError):
+        return None
+
+
+def _main_content_text(html_content: str) -> Tuple[str, str]:
+    """
+    Finds the title and main content of a page with the fastest available HTML parser.
+
+    Args:
+        html_content (str): The full HTML content
+
+    Returns:
+        Tuple[str, str]:
+            - str: Text of the main content container, or of the whole page if there is none.
+            - str: Text of the first <h1>, or of the <title>, or "Blog Post".
+    """
+    if HTMLParser is not None:
+        tree = HTMLParser(html_content)
+        tree.strip_tags(['script', 'style'])
+        title_node = tree.css_first('h1') or tree.css_first('title')
+        title = title_node.text(separator=' ') if title_node is not None else ""
+        for selector in _MAIN_CONTENT_SELECTORS:
+            node = tree.css_first(selector)
+            if node is not None:
+                return node.text(separator=' '), title
+        return (tree.root.text(separator=' ') if tree.root is not None else ""), title
 
+    root = _parse_lxml(html_content) if lxml_html is not None else None
+    if root is not None:
+        lxml_etree.strip_elements(root, 'script', 'style', with_tail=False)
+        title_nodes = root.xpath('//h1') or root.xpath('//title')
+        title = title_nodes[0].text_content() if title_nodes else ""
+        for xpath in _MAIN_CONTENT_XPATHS:
+            nodes = root.xpath(xpath)
+            if nodes:
+                return ' '.join(nodes[0].itertext()), title
+        return ' '.join(root.itertext()), title
 
-def extract_main_content(html_content: str, max_chars: int = 8000) -> str:
+    title_match = _H1_RE.search(html_content) or _TITLE_RE.search(html_content)
+    title = _html_to_text(title_match.group(1)) if title_match else ""
+    for pattern in _MAIN_CONTENT_PATTERNS:
+        match = pattern.search(html_content)  # Only the first match is used, stop scanning there
+        if match:
+            return _html_to_text(match.group(1)), title
+    return _html_to_text(html_content), title
+
+
+def extract_main_content(html_content: str, max_chars: int = 1500) -> str:
     """
-    Extracts just the main content of a blog post to reduce text size.
+    Extracts the title and the beginning of the main content of a blog post,
+    which is all the LLM needs for a title and a one-paragraph summary.
     
     Args:
         html_content (str): The full HTML content
-        max_chars (int): Maximum characters to extract
+        max_chars (int): Maximum characters of content to keep. The lede of a
+            post almost always fits in the default.
         
     Returns:
-        str: Extracted main content
-    """
-    # Try to find the main article content
-    main_content_patterns = [
-        r'<article[^>]*>(.*?)</article>',
-        r'<div[^>]*class="[^"]*post-content[^"]*"[^>]*>(.*?)</div>',
-        r'<div[^>]*class="[^"]*blog-content[^"]*"[^>]*>(.*?)</div>',
-        r'<div[^>]*class="[^"]*content[^"]*"[^>]*>(.*?)</div>'
-    ]
-    
-    for pattern in main_content_patterns:
-        matches = re.findall(pattern, html_content, re.DOTALL)
-        if matches:
-            # Take the first match and strip HTML tags
-            content = re.sub(r'<[^>]+>', ' ', matches[0])
-            # Remove extra whitespace
-            content = re.sub(r'\s+', ' ', content).strip()
-            # Truncate if necessary
-            if len(content) > max_chars:
-                content = content[:max_chars] + "..."
-            return content
-    
-    # If no main content found, extract the title and take some content from the page
-    title_match = re.search(r'<title[^>]*>(.*?)</title>', html_content)
-    title = title_match.group(1) if title_match else "Blog Post"
-    
-    # Strip all HTML tags and take a portion
-    content = re.sub(r'<[^>]+>', ' ', html_content)
-    content = re.sub(r'\s+', ' ', content).strip()
+        str: The title and extracted main content
+    """
+    # Only a short lede is kept, so parse a bounded window starting at the article
+    # instead of the whole page (navigation, footer, inline scripts...)
+    start = max(html_content.find('<article'), 0)
+    content, title = _main_content_text(html_content[start:start + MAX_HTML_SCAN_CHARS])
+    if not title and start:
+        # The window skipped the <head>, look for the page title there
+        title_match = _TITLE_RE.search(html_content, 0, start)
+        title = _html_to_text(title_match.group(1)) if title_match else ""
+    # Remove extra whitespace
+    content = _WS_RE.sub(' ', content).strip()
+    title = _WS_RE.sub(' ', title).strip() or "Blog Post"
     
     # Limit content length
     if len(content) > max_chars:
         content = content[:max_chars] + "..."
     
-    return f"{title}\n\n{content}"
+    return f"TITLE: {title}\n\n{content}"
+
+
+def _absolute_url(link: str) -> str:
+    """
+    Resolves a link found on the blog against the site root. Absolute links are
+    returned unchanged, and root-relative, relative ("../") and protocol-relative
+    ("//cdn...") links are resolved like a browser would.
+    """
+    return urljoin(_SITE_ROOT, link) if link else link
+
+
+def _find_blog_links(html_content: str) -> List[Tuple[str, str]]:
+    """
+    Lists the anchors pointing to blog pages, with the fastest available HTML parser.
+
+    Args:
+        html_content (str): The HTML content of a blog listing page
+
+    Returns:
+        List[Tuple[str, str]]: (href, text) pairs in document order, with whitespace
+            in the text collapsed.
+    """
+    if HTMLParser is not None:
+        return [
+            (node.attributes.get('href') or '', _WS_RE.sub(' ', node.text()).strip())
+            for node in HTMLParser(html_content).css('a[href*="/blog/"]')
+        ]
+
+    root = _parse_lxml(html_content) if lxml_html is not None else None
+    if root is not None:
+        return [
+            (node.get('href', ''), _WS_RE.sub(' ', node.text_content()).strip())
+            for node in root.xpath('//a[contains(@href, "/blog/")]')
+        ]
+
+    return [
+        (link, _WS_RE.sub(' ', _TAG_STRIP_RE.sub('', title_html)).strip())
+        for link, title_html in _BLOG_LINK_RE.findall(html_content)
+    ]
+
+
+def _article_fields(html_content: str) -> Optional[Tuple[str, List[str]]]:
+    """
+    Reads the heading and paragraphs of the <article> element with an HTML parser.
+
+    Args:
+        html_content (str): The HTML content of the blog post
+
+    Returns:
+        Optional[Tuple[str, List[str]]]: The text of the first heading and of the
+            paragraphs in the article, None if there is no article or no HTML parser.
+    """
+    start = html_content.find('<article')
+    if start < 0:
+        return None
+    window = html_content[start:start + MAX_HTML_SCAN_CHARS]
+
+    if HTMLParser is not None:
+        tree = HTMLParser(window)
+        heading = tree.css_first('article h1')
+        if heading is None:
+            return None
+        paragraphs = tree.css('article p')[:_FAST_PATH_MAX_PARAGRAPHS * 2]
+        return heading.text(separator=' '), [node.text(separator=' ') for node in paragraphs]
+
+    root = _parse_lxml(window) if lxml_html is not None else None
+    if root is not None:
+        headings = root.xpath('//article//h1')
+        if not headings:
+            return None
+        paragraphs = root.xpath('//article//p')[:_FAST_PATH_MAX_PARAGRAPHS * 2]
+        return headings[0].text_content(), [node.text_content() for node in paragraphs]
+
+    return None
+
+
+def _extract_from_article(html_content: str, url: str) -> Optional[Dict[str, str]]:
+    """
+    Fast path of extract_blog_post_content for pages with an <article><h1>...<p>... layout.
+
+    Returns:
+        Optional[Dict[str, str]]: The post, or None if the article does not yield a
+            usable title and body.
+    """
+    fields = _article_fields(html_content)
+    if fields is None:
+        return None
+
+    heading, paragraphs = fields
+    title = _WS_RE.sub(' ', heading).strip()
+    cleaned_paragraphs = []
+    for paragraph in paragraphs:
+        text = _WS_RE.sub(' ', paragraph).strip()
+        if len(text) > 20:  # Ignore very short paragraphs
+            cleaned_paragraphs.append(text)
+            if len(cleaned_paragraphs) == _FAST_PATH_MAX_PARAGRAPHS:
+                break
+    body = " ".join(cleaned_paragraphs)
+
+    if len(title) <= 5 or len(body) < _FAST_PATH_MIN_BODY_CHARS:
+        return None
+    return {"title": title, "body": body, "link": url}
 
 
 def extract_blog_post_content(html_content: str, url: str) -> Dict[str, str]:
     """
     Extracts blog post content using direct HTML parsing instead of relying on LLM.
+
+    Pages with an <article> holding an <h1> and paragraphs are read from the DOM;
+    other layouts go through a cascade of patterns.
     
     Args:
         html_content (str): The HTML content of the blog post
@@ -118,45 +509,39 @@ def extract_blog_post_content(html_content: str, url: str) -> Dict[str, str]:
     Returns:
         Dict[str, str]: Dictionary with title, body, and link
     """
+    post = _extract_from_article(html_content, url)
+    _fast_path_stats["hits" if post else "misses"] += 1
+    if logger.isEnabledFor(logging.DEBUG):
+        total = _fast_path_stats["hits"] + _fast_path_stats["misses"]
+        logger.debug("Article fast path hit rate: %d/%d", _fast_path_stats["hits"], total)
+    if post:
+        return post
+
     # Extract title
-    title_patterns = [
-        r'<h1[^>]*>(.*?)</h1>',
-        r'<title[^>]*>(.*?)</title>',
-        r'<meta\s+property="og:title"\s+content="([^"]+)"'
-    ]
-    
     title = "Untitled Blog Post"
-    for pattern in title_patterns:
-        matches = re.search(pattern, html_content, re.DOTALL)
+    for pattern in _TITLE_PATTERNS:
+        matches = pattern.search(html_content)
         if matches:
             title_text = matches.group(1)
             # Clean up HTML tags
-            title = re.sub(r'<[^>]+>', '', title_text).strip()
+            title = _TAG_STRIP_RE.sub('', title_text).strip()
             if title and len(title) > 5:
                 break
     
     # Extract content paragraphs
-    paragraph_patterns = [
-        r'<div[^>]*class="[^"]*blog-content[^"]*"[^>]*>(.*?)</div>',
-        r'<div[^>]*class="[^"]*post-content[^"]*"[^>]*>(.*?)</div>',
-        r'<article[^>]*>(.*?)</article>',
-        r'<div[^>]*class="[^"]*content[^"]*"[^>]*>(.*?)</div>'
-    ]
-    
     content = ""
-    for pattern in paragraph_patterns:
-        matches = re.search(pattern, html_content, re.DOTALL)
+    for pattern in _PARAGRAPH_CONTAINER_PATTERNS:
+        matches = pattern.search(html_content)
         if matches:
             content_html = matches.group(1)
             
             # Extract paragraphs from the content
-            paragraphs = re.findall(r'<p[^>]*>(.*?)</p>', content_html, re.DOTALL)
+            paragraphs = _PARAGRAPH_RE.findall(content_html)
             if paragraphs:
                 # Clean up paragraphs and join them
                 cleaned_paragraphs = []
                 for p in paragraphs[:5]:  # Take first 5 paragraphs at most
-                    p_text = re.sub(r'<[^>]+>', ' ', p).strip()
-                    p_text = re.sub(r'\s+', ' ', p_text)
+                    p_text = _html_to_text(p)
                     if len(p_text) > 20:  # Ignore very short paragraphs
                         cleaned_paragraphs.append(p_text)
                 
@@ -167,16 +552,15 @@ def extract_blog_post_content(html_content: str, url: str) -> Dict[str, str]:
     # If we couldn't find paragraphs, try a more general approach
     if not content:
         # Remove script and style elements
-        html_content = re.sub(r'<script[^>]*>.*?</script>', '', html_content, flags=re.DOTALL)
-        html_content = re.sub(r'<style[^>]*>.*?</style>', '', html_content, flags=re.DOTALL)
+        html_content = _SCRIPT_RE.sub('', html_content)
+        html_content = _STYLE_RE.sub('', html_content)
         
         # Try to find any paragraph content
-        paragraphs = re.findall(r'<p[^>]*>(.*?)</p>', html_content, re.DOTALL)
+        paragraphs = _PARAGRAPH_RE.findall(html_content)
         if paragraphs:
             cleaned_paragraphs = []
             for p in paragraphs[:5]:
-                p_text = re.sub(r'<[^>]+>', ' ', p).strip()
-                p_text = re.sub(r'\s+', ' ', p_text)
+                p_text = _html_to_text(p)
                 if len(p_text) > 20:
                     cleaned_paragraphs.append(p_text)
             
@@ -186,8 +570,7 @@ def extract_blog_post_content(html_content: str, url: str) -> Dict[str, str]:
     # If still no content, take a general approach
     if not content:
         # Strip all HTML tags and take a portion
-        stripped_content = re.sub(r'<[^>]+>', ' ', html_content)
-        stripped_content = re.sub(r'\s+', ' ', stripped_content).strip()
+        stripped_content = _html_to_text(html_content)
         
         # Find a chunk of text that seems like content (not navigation/headers/footers)
         chunks = stripped_content.split('   ')
@@ -198,7 +581,7 @@ def extract_blog_post_content(html_content: str, url: str) -> Dict[str, str]:
     
     # Final fallback
     if not content:
-        content = "Could not extract blog post content."
+        content = _NO_CONTENT_BODY
     
     return {
         "title": title,
@@ -225,7 +608,7 @@ async def extract_blog_post_links(
     Returns:
         List[Dict[str, str]]: List of dictionaries with blog post titles and links.
     """
-    print(f"Extracting blog post links from {url}...")
+    logger.info("Extracting blog post links from %s...", url)
     
     # Fetch the main page without any extraction strategy
     result = await crawler.arun(
@@ -237,78 +620,139 @@ async def extract_blog_post_links(
     )
     
     if not result.success:
-        print(f"Error fetching the main page: {result.error_message}")
+        logger.error("Error fetching the main page: %s", result.error_message)
         return []
         
-    # Use regex to find blog post links and titles from the HTML
-    links_data = []
+    # Find blog post links and titles in the HTML
+    entries = []  # (priority, link data) pairs, priority 0 for posts and 1 for category pages
+    seen_links = set()  # Links already in entries, for constant-time duplicate checks
     
-    # Pattern for blog post links - looking for blog post links specifically
-    blog_link_pattern = r'<a\s+[^>]*href="([^"]*(?:\/blog\/[^"]*|\/blog\/[^\/]+\/[^"]*))"\s*[^>]*>(.*?)<\/a>'
-    
-    matches = re.findall(blog_link_pattern, result.cleaned_html)
-    
-    for link, title_html in matches:
-        # Clean up the title - remove HTML tags
-        title = re.sub(r'<[^>]+>', '', title_html).strip()
+    for link, title in _find_blog_links(result.cleaned_html):
         if title and link and "/blog/" in link:
             # Skip obvious navigation links
-            if any(x in title.lower() for x in ['next', 'previous', 'all posts', 'view all']):
+            if _NAV_RE.search(title):
                 continue
                 
             # Make sure link is absolute
-            if not link.startswith("http"):
-                if link.startswith("/"):
-                    link = f"https://www.upguard.com{link}"
-                else:
-                    link = f"https://www.upguard.com/{link}"
+            link = _absolute_url(link)
             
             # Only add links that seem to be actual blog posts (not category pages)
-            if len(title) > 10 and link not in [item["link"] for item in links_data]:
-                links_data.append({"title": title, "link": link})
+            if len(title) > 10 and link not in seen_links:
+                seen_links.add(link)
+                # Posts are nested deeper than category pages, compute it once per link
+                priority = 0 if link.count("/") > 4 else 1
+                entries.append((priority, {"title": title, "link": link}))
     
-    # Sort links to prioritize actual blog posts over category pages
-    links_data.sort(key=lambda x: 0 if x["link"].count("/") > 4 else 1)
+    # Sort links to prioritize actual blog posts over category pages (stable, so page order is kept)
+    entries.sort(key=itemgetter(0))
     
     # Limit the number of links
-    links_data = links_data[:max_links]
+    links_data = [link_data for _, link_data in entries[:max_links]]
     
-    print(f"Found {len(links_data)} blog post links using direct HTML parsing")
+    logger.info("Found %d blog post links using direct HTML parsing", len(links_data))
     return links_data
 
 
+def _get_post_cache():
+    """
+    Opens the post cache on first use, so importing this module creates no files.
+
+    Returns:
+        Optional[diskcache.Cache]: The cache, or None if diskcache is not installed.
+    """
+    global _post_cache
+    if _post_cache is None and diskcache is not None:
+        _post_cache = diskcache.Cache(POST_CACHE_DIR)
+    return _post_cache
+
+
+def _post_cache_key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
 async def scrape_blog_post(
     crawler: AsyncWebCrawler,
     url: str,
     title: str,
     session_id: str,
+    on_result: Optional[Callable[[ScrapeResult], None]] = None,
+    limiter: Optional[HostRateLimiter] = None,
+    max_retries: int = 3,
+    use_cache: bool = True,
 ) -> Optional[Dict]:
     """
     Scrapes the content of an individual blog post.
 
+    Posts scraped from a 2xx response with some content are kept in an on-disk
+    cache for POST_CACHE_TTL seconds when diskcache is installed.
+
     Args:
         crawler (AsyncWebCrawler): The web crawler instance.
         url (str): The URL of the blog post.
         title (str): The title of the blog post (from the link extraction).
         session_id (str): The session identifier.
+        on_result (Optional[Callable[[ScrapeResult], None]]): Called with the status
+            and duration of each page request, e.g. AutoscaledPool.record.
+        limiter (Optional[HostRateLimiter]): Waited on before each request and fed
+            the rate-limit headers of each response.
+        max_retries (int): How many times to retry after a 429 or 503 response.
+        use_cache (bool): Return a cached copy of the post if there is one. Pass
+            False to force a fresh scrape, e.g. when refreshing a post.
 
     Returns:
-        Optional[Dict]: Blog post data if successful, None otherwise.
+        Optional[Dict]: Blog post data if successful, None if the server kept
+            answering with an HTTP error.
     """
-    print(f"Scraping blog post: {title} at {url}")
+    cache = _get_post_cache()
+    cache_key = _post_cache_key(url)
+    if use_cache and cache is not None:
+        # diskcache is backed by SQLite, keep its disk access off the event loop
+        cached_post = await asyncio.to_thread(cache.get, cache_key)
+        if cached_post is not None:
+            logger.debug("Using cached copy of blog post: %s", title)
+            return cached_post
+
+    logger.debug("Scraping blog post: %s at %s", title, url)
     
+    result = None
+    start_time = time.perf_counter()
     try:
-        # Fetch the page without any extraction strategy
-        result = await crawler.arun(
-            url=url,
-            config=CrawlerRunConfig(
-                cache_mode=CacheMode.BYPASS,
-                session_id=session_id,
-            ),
-        )
+        for attempt in range(max_retries + 1):
+            if limiter:
+                await limiter.acquire(url)
+
+            result = None
+            start_time = time.perf_counter()
+            # Fetch the page without any extraction strategy
+            result = await crawler.arun(
+                url=url,
+                config=CrawlerRunConfig(
+                    cache_mode=CacheMode.BYPASS,
+                    session_id=session_id,
+                ),
+            )
+
+            if limiter:
+                limiter.update(url, result.response_headers)
+            if on_result:
+                status = result.status_code or (200 if result.success else 0)
+                on_result(ScrapeResult(status=status, elapsed=time.perf_counter() - start_time))
+
+            if result.status_code not in RETRYABLE_STATUSES or attempt == max_retries:
+                break
+            delay = exponential_backoff(attempt)
+            logger.warning(
+                "Got HTTP %s for %s, retrying in %.1fs (%d/%d)", result.status_code, url, delay, attempt + 1, max_retries
+            )
+            await asyncio.sleep(delay)
         
+        if (result.status_code or 0) >= 400:
+            # Out of retries or not retryable, the page is an error page and not the post
+            logger.warning("Giving up on blog post %s after HTTP %s", url, result.status_code)
+            return None
+
         if not result.success:
-            print(f"Error fetching blog post page: {result.error_message}")
+            logger.warning("Error fetching blog post page: %s", result.error_message)
             return fallback_post(title, url)
             
         # Use direct HTML parsing to extract content instead of LLM
@@ -318,15 +762,199 @@ async def scrape_blog_post(
         if not post_data.get("title") or post_data["title"] == "Untitled Blog Post":
             post_data["title"] = title
         
-        print(f"Successfully extracted content for: {post_data['title']}")
-        print(f"Content preview: {post_data['body'][:100]}...")
-            
+        logger.debug("Successfully extracted content for: %s", post_data["title"])
+        logger.debug("Content preview: %.100s...", post_data["body"])
+
+        # Only cache real posts, placeholders would be replayed for the whole TTL
+        if cache is not None and 200 <= (result.status_code or 0) < 300 and post_data["body"] != _NO_CONTENT_BODY:
+            await asyncio.to_thread(cache.set, cache_key, post_data, expire=POST_CACHE_TTL)
         return post_data
     except Exception as e:
-        print(f"Error when scraping blog post {title}: {str(e)}")
+        logger.warning("Error when scraping blog post %s: %s", title, e)
+        if on_result and result is None:
+            # No usable response, treat it like a timeout
+            on_result(ScrapeResult(status=0, elapsed=time.perf_counter() - start_time))
         return fallback_post(title, url)
 
 
+async def scrape_blog_posts_batch(
+    crawler: AsyncWebCrawler,
+    links: List[Dict[str, str]],
+    session_id: str,
+    max_concurrency: int = 5,
+    limiter: Optional[HostRateLimiter] = None,
+) -> List[Optional[Dict]]:
+    """
+    Scrapes several blog posts concurrently.
+
+    Each concurrent request gets its own session from a pool, as a crawl4ai
+    session is a single browser page. Sessions are reused across requests so
+    pages stay warm.
+
+    Args:
+        crawler (AsyncWebCrawler): The web crawler instance.
+        links (List[Dict[str, str]]): Blog post titles and links, as returned by
+            extract_blog_post_links.
+        session_id (str): Prefix of the session identifiers.
+        max_concurrency (int): Maximum number of posts scraped at the same time.
+        limiter (Optional[HostRateLimiter]): Spaces out requests to the same host.
+
+    Returns:
+        List[Optional[Dict]]: Blog post data in the order of `links`. Posts that
+            raised an error are replaced by a fallback post, posts that got an HTTP
+            error by None.
+    """
+    max_concurrency = max(min(max_concurrency, len(links)), 1)
+    sem = asyncio.Semaphore(max_concurrency)
+    sessions = make_session_pool(session_id, max_concurrency)
+
+    async def scrape_one(item: Dict[str, str]) -> Optional[Dict]:
+        async with sem:
+            worker_session = await sessions.get()
+            try:
+                return await scrape_blog_post(crawler, item["link"], item["title"], worker_session, limiter=limiter)
+            finally:
+                sessions.put_nowait(worker_session)
+
+    results = await asyncio.gather(*(scrape_one(item) for item in links), return_exceptions=True)
+
+    posts = []
+    for item, result in zip(links, results):
+        if isinstance(result, Exception):
+            logger.warning("Error when scraping blog post %s: %s", item["title"], result)
+            result = fallback_post(item["title"], item["link"])
+        elif isinstance(result, BaseException):
+            raise result  # Cancellation, let it propagate
+        posts.append(result)
+    return posts
+
+
+def _batch_prompt(batch: List[Dict[str, str]]) -> str:
+    """
+    Joins the main content of several posts into one delimited prompt.
+    """
+    return "\n\n".join(
+        f"--- POST {k} ---\nURL: {item['link']}\n{item['content']}" for k, item in enumerate(batch, 1)
+    )
+
+
+def _batch_strategy(
+    strategies: Dict[str, LLMExtractionStrategy],
+    content_length: int,
+    escalate: bool = False,
+) -> LLMExtractionStrategy:
+    """
+    Returns the batch strategy for the model picked by _pick_model, creating it on first use.
+    """
+    model = _pick_model(content_length, escalate)
+    if model not in strategies:
+        strategies[model] = get_content_extraction_strategy(
+            content_length=content_length,
+            escalate=escalate,
+            instruction=_BATCH_EXTRACTION_INSTRUCTION,
+            apply_chunking=False,  # Chunks could split a post or reorder the answers
+        )
+    return strategies[model]
+
+
+async def _extract_batch(
+    strategies: Dict[str, LLMExtractionStrategy],
+    batch: List[Dict[str, str]],
+    escalate: bool = False,
+) -> Optional[List[Dict]]:
+    """
+    Extracts a group of posts with a single LLM request, on the model that fits the prompt.
+
+    Returns:
+        Optional[List[Dict]]: One post per item of `batch`, in the same order, or None
+            if the model did not return exactly one complete post per item.
+    """
+    prompt = _batch_prompt(batch)
+    strategy = _batch_strategy(strategies, len(prompt), escalate)
+    try:
+        # LLMExtractionStrategy.run is blocking, keep it off the event loop
+        extracted = await asyncio.to_thread(strategy.run, batch[0]["link"], [prompt])
+    except Exception as e:
+        logger.warning("Batch extraction of %d posts failed: %s", len(batch), e)
+        return None
+
+    posts = [post for post in extracted if isinstance(post, dict) and not post.get("error")]
+    if len(posts) != len(batch):
+        logger.debug("Expected %d posts from batch extraction, got %d", len(batch), len(posts))
+        return None
+
+    for post, item in zip(posts, batch):
+        post.pop("error", None)
+        # A different URL means the model reordered or mixed up posts, so the
+        # summary cannot be trusted to belong to this item
+        link = post.get("link")
+        if link and _absolute_url(link).rstrip("/") != _absolute_url(item["link"]).rstrip("/"):
+            logger.debug("Batch extraction returned %s in place of %s", link, item["link"])
+            return None
+        post["link"] = item["link"]
+        if not post.get("title"):
+            post["title"] = item["title"]
+        if not post.get("body"):
+            return None
+    return posts
+
+
+async def extract_blog_posts_batch(
+    items: List[Dict[str, str]],
+    batch_size: int = 4,
+    strategies: Optional[Dict[str, LLMExtractionStrategy]] = None,
+) -> List[Dict]:
+    """
+    Summarizes blog posts with the LLM, several posts per request.
+
+    The main content of `batch_size` posts is sent in one prompt, so the schema
+    and instruction are paid for once per batch instead of once per post, and
+    the batch costs a single round-trip. Batches whose answer does not hold
+    exactly one complete post per item are retried one post at a time on the
+    larger model. Other requests go to the model that _pick_model picks for the
+    prompt length.
+
+    This is a library function: main.py extracts posts from the HTML without
+    the LLM and does not call it.
+
+    Args:
+        items (List[Dict[str, str]]): Posts with their "title", "link" and page "html".
+        batch_size (int): Number of posts sent in each request.
+        strategies (Optional[Dict[str, LLMExtractionStrategy]]): Strategies by model,
+            filled in as they are needed. Pass a dict to reuse them across calls or
+            to read their usage afterwards with report_llm_usage.
+
+    Returns:
+        List[Dict]: Blog post data in the order of `items`. Posts that could not be
+            extracted are replaced by a fallback post.
+    """
+    if strategies is None:
+        strategies = {}
+
+    prepared = [
+        {"title": item["title"], "link": item["link"], "content": extract_main_content(item["html"])}
+        for item in items
+    ]
+
+    posts = []
+    batch_size = max(batch_size, 1)
+    for start in range(0, len(prepared), batch_size):
+        batch = prepared[start:start + batch_size]
+        batch_posts = await _extract_batch(strategies, batch)
+        if batch_posts is None:
+            logger.info(
+                "Batch extraction returned an unexpected result, extracting %d posts one by one with %s",
+                len(batch), LARGE_MODEL,
+            )
+            batch_posts = []
+            for item in batch:
+                # Re-sending the post to the model that just failed would likely fail again
+                single = await _extract_batch(strategies, [item], escalate=True)
+                batch_posts.append(single[0] if single else fallback_post(item["title"], item["link"], item["content"]))
+        posts.extend(batch_posts)
+    return posts
+
+
 def fallback_post(title: str, url: str, content_snippet: str = "") -> Dict:
     """
     Creates a fallback blog post when extraction fails.
@@ -342,7 +970,7 @@ def fallback_post(title: str, url: str, content_snippet: str = "") -> Dict:
     body = "Content extraction failed due to API limitations."
     if content_snippet:
         # Clean up the snippet
-        snippet = re.sub(r'\s+', ' ', content_snippet).strip()
+        snippet = _WS_RE.sub(' ', content_snippet).strip()
         body = f"{body} Partial content: {snippet[:300]}..."
         
     return {
@@ -352,41 +980,144 @@ def fallback_post(title: str, url: str, content_snippet: str = "") -> Dict:
     }
 
 
-async def check_no_results(
+async def fetch_page(
     crawler: AsyncWebCrawler,
-    url: str,
+    page_number: int,
+    base_url: str,
+    css_selector: str,
+    llm_strategy: LLMExtractionStrategy,
     session_id: str,
-) -> bool:
+) -> Tuple[Optional[CrawlResult], bool]:
     """
-    Checks if there are no blog posts on the page.
+    Fetches a single page of blog posts and runs the extraction strategy on it.
+
+    The page is loaded once: the check for remaining blog posts and the
+    extraction both work on that response.
 
     Args:
         crawler (AsyncWebCrawler): The web crawler instance.
-        url (str): The URL to check.
+        page_number (int): The page number to fetch.
+        base_url (str): The base URL of the website.
+        css_selector (str): The CSS selector to target the content.
+        llm_strategy (LLMExtractionStrategy): The LLM extraction strategy.
         session_id (str): The session identifier.
 
     Returns:
-        bool: True if no blog posts are found, False otherwise.
+        Tuple[Optional[CrawlResult], bool]:
+            - Optional[CrawlResult]: The crawl result, None when there are no more posts.
+            - bool: A flag indicating if no more blog posts were found.
     """
-    # Fetch the page without any CSS selector or extraction strategy
-    result = await crawler.arun(
+    # For UpGuard blog, the URL format might be different
+    if page_number == 1:
+        url = base_url
+    else:
+        url = f"{base_url}?page={page_number}"
+    
+    logger.info("Loading page %d...", page_number)
+
+    # Fetch the page once, without any CSS selector or extraction strategy
+    page = await crawler.arun(
         url=url,
         config=CrawlerRunConfig(
-            cache_mode=CacheMode.BYPASS,
-            session_id=session_id,
+            cache_mode=CacheMode.BYPASS,  # Do not use cached data
+            session_id=session_id,  # Unique session ID for the crawl
         ),
     )
+    if not page.success:
+        return page, False  # Reported by process_page
 
-    if result.success:
-        # Check if there are any blog post cards on the page
-        if "blog-post-card" not in result.cleaned_html:
-            return True
-    else:
-        print(
-            f"Error fetching page for blog post check: {result.error_message}"
+    # Check if there are no blog posts on the page
+    if "blog-post-card" not in page.cleaned_html:
+        return None, True  # No more results, signal to stop crawling
+
+    # Run the extraction on the HTML we already have instead of loading the page again
+    try:
+        result = await crawler.aprocess_html(
+            url=url,
+            html=page.html,
+            extracted_content=None,
+            config=CrawlerRunConfig(
+                cache_mode=CacheMode.BYPASS,
+                extraction_strategy=llm_strategy,  # Strategy for data extraction
+                css_selector=css_selector,  # Target specific content on the page
+            ),
+            screenshot=None,
+            pdf_data=None,
+            verbose=False,
         )
+    except Exception as e:
+        logger.error("Error extracting blog posts from page %d: %s", page_number, e)
+        return page, False
+    return result, False
+
 
-    return False
+def process_page(
+    result: CrawlResult,
+    page_number: int,
+    required_keys: List[str],
+    seen_titles: Set[str],
+) -> List[dict]:
+    """
+    Parses the extracted content of a page and keeps the complete, unseen blog posts.
+
+    Args:
+        result (CrawlResult): The crawl result returned by `fetch_page`.
+        page_number (int): The page number, used in messages.
+        required_keys (List[str]): List of required keys in the blog post data.
+        seen_titles (Set[str]): Fingerprints (see title_fingerprint) of the blog post titles
+            that have already been seen.
+            The fingerprints of the returned posts are added to it.
+
+    Returns:
+        List[dict]: A list of processed blog posts from the page.
+    """
+    if not (result.success and result.extracted_content):
+        logger.error("Error fetching page %d: %s", page_number, result.error_message)
+        return []
+
+    # Parse extracted content
+    extracted_data = _parse_extracted_content(result.extracted_content)
+    if not extracted_data:
+        logger.info("No blog posts found on page %d.", page_number)
+        return []
+
+    # Per-post debug messages are only built when asked for
+    debug = logger.isEnabledFor(logging.DEBUG)
+
+    # Convert once instead of once per post
+    required_keys = frozenset(required_keys)
+
+    # Process blog posts in a single pass, cheapest rejections first
+    complete_posts = []
+    for post in extracted_data:
+        title = post.get("title")
+        fingerprint = title_fingerprint(str(title)) if title else ""
+        if not fingerprint or is_duplicate_post(fingerprint, seen_titles):
+            if debug:
+                logger.debug("Duplicate or untitled post '%s' found. Skipping.", title)
+            continue
+
+        if not is_complete_post(post, required_keys):
+            if debug:
+                logger.debug("Incomplete post: %s", post)
+            continue
+
+        # Ignore the 'error' key if it's False
+        if post.get("error") is False:
+            del post["error"]
+
+        # Make sure the link is a complete URL
+        post["link"] = _absolute_url(post["link"])
+
+        seen_titles.add(fingerprint)
+        complete_posts.append(post)
+
+    if not complete_posts:
+        logger.info("No complete blog posts found on page %d.", page_number)
+        return []
+
+    logger.info("Extracted %d blog posts from page %d.", len(complete_posts), page_number)
+    return complete_posts
 
 
 async def fetch_and_process_page(
@@ -410,82 +1141,86 @@ async def fetch_and_process_page(
         llm_strategy (LLMExtractionStrategy): The LLM extraction strategy.
         session_id (str): The session identifier.
         required_keys (List[str]): List of required keys in the blog post data.
-        seen_titles (Set[str]): Set of blog post titles that have already been seen.
+        seen_titles (Set[str]): Fingerprints (see title_fingerprint) of the blog post titles
+            that have already been seen.
 
     Returns:
         Tuple[List[dict], bool]:
             - List[dict]: A list of processed blog posts from the page.
             - bool: A flag indicating if no more blog posts were found.
     """
-    # For UpGuard blog, the URL format might be different
-    if page_number == 1:
-        url = base_url
-    else:
-        url = f"{base_url}?page={page_number}"
-    
-    print(f"Loading page {page_number}...")
-
-    # Check if there are no blog posts on the page
-    no_results = await check_no_results(crawler, url, session_id)
+    result, no_results = await fetch_page(crawler, page_number, base_url, css_selector, llm_strategy, session_id)
     if no_results:
-        return [], True  # No more results, signal to stop crawling
-
-    # Fetch page content with the extraction strategy
-    result = await crawler.arun(
-        url=url,
-        config=CrawlerRunConfig(
-            cache_mode=CacheMode.BYPASS,  # Do not use cached data
-            extraction_strategy=llm_strategy,  # Strategy for data extraction
-            css_selector=css_selector,  # Target specific content on the page
-            session_id=session_id,  # Unique session ID for the crawl
-        ),
-    )
+        return [], True
+    return process_page(result, page_number, required_keys, seen_titles), False  # Continue crawling
 
-    if not (result.success and result.extracted_content):
-        print(f"Error fetching page {page_number}: {result.error_message}")
-        return [], False
 
-    # Parse extracted content
-    extracted_data = json.loads(result.extracted_content)
-    if not extracted_data:
-        print(f"No blog posts found on page {page_number}.")
-        return [], False
-
-    # After parsing extracted content
-    print("Extracted data:", extracted_data)
+async def page_stream(
+    crawler: AsyncWebCrawler,
+    base_url: str,
+    css_selector: str,
+    llm_strategy: LLMExtractionStrategy,
+    session_id: str,
+    required_keys: List[str],
+    seen_titles: Set[str],
+    max_pages: Optional[int] = None,
+    max_failed_pages: int = 3,
+) -> AsyncIterator[Tuple[int, List[dict]]]:
+    """
+    Yields the blog posts of each page, fetching the next page while the
+    current one is parsed and consumed.
 
-    # Process blog posts
-    complete_posts = []
-    for post in extracted_data:
-        # Debugging: Print each post to understand its structure
-        print("Processing blog post:", post)
+    Only one fetch is in flight at any time, so the pages can share a session.
 
-        # Ignore the 'error' key if it's False
-        if post.get("error") is False:
-            post.pop("error", None)  # Remove the 'error' key if it's False
+    Args:
+        crawler (AsyncWebCrawler): The web crawler instance.
+        base_url (str): The base URL of the website.
+        css_selector (str): The CSS selector to target the content.
+        llm_strategy (LLMExtractionStrategy): The LLM extraction strategy.
+        session_id (str): The session identifier.
+        required_keys (List[str]): List of required keys in the blog post data.
+        seen_titles (Set[str]): Fingerprints (see title_fingerprint) of the blog post titles
+            that have already been seen.
+        max_pages (Optional[int]): Stop after this many pages, None to crawl until
+            a page without blog posts is found.
+        max_failed_pages (int): Stop after this many consecutive pages could not be
+            fetched or extracted, e.g. when the network is down or the crawler is blocked.
 
-        if not is_complete_post(post, required_keys):
-            print(f"Incomplete post: {post}")
-            continue  # Skip incomplete posts
+    Yields:
+        Tuple[int, List[dict]]: The page number and the processed blog posts of that page.
+    """
+    def fetch(page_number: int) -> asyncio.Task:
+        return asyncio.create_task(
+            fetch_page(crawler, page_number, base_url, css_selector, llm_strategy, session_id)
+        )
 
-        if is_duplicate_post(post["title"], seen_titles):
-            print(f"Duplicate post '{post['title']}' found. Skipping.")
-            continue  # Skip duplicate posts
+    page_number = 1
+    failed_pages = 0
+    pending = fetch(page_number)
+    try:
+        while pending is not None:
+            result, no_results = await pending
+            if no_results:
+                return
 
-        # Make sure the link is a complete URL
-        if post["link"] and not post["link"].startswith("http"):
-            if post["link"].startswith("/"):
-                post["link"] = f"https://www.upguard.com{post['link']}"
-            else:
-                post["link"] = f"https://www.upguard.com/{post['link']}"
-
-        # Add post to the list
-        seen_titles.add(post["title"])
-        complete_posts.append(post)
+            # Same check as process_page, which logs the error of each failed page
+            failed_pages = 0 if result.success and result.extracted_content else failed_pages + 1
 
-    if not complete_posts:
-        print(f"No complete blog posts found on page {page_number}.")
-        return [], False
+            pending = None
+            if failed_pages >= max_failed_pages:
+                logger.error("Stopping after %d consecutive pages failed", failed_pages)
+            elif max_pages is None or page_number < max_pages:
+                pending = fetch(page_number + 1)
+                # Let the prefetch send its request before parsing blocks the event loop
+                await asyncio.sleep(0)
 
-    print(f"Extracted {len(complete_posts)} blog posts from page {page_number}.")
-    return complete_posts, False  # Continue crawling
+            yield page_number, process_page(result, page_number, required_keys, seen_titles)
+            page_number += 1
+    finally:
+        # The consumer stopped early or failed, drop the prefetched page
+        if pending is not None:
+            pending.cancel()
+            try:
+                await pending
+            except (asyncio.CancelledError, Exception):
+                pass